@@ -1,8 +1,16 @@
 import argparse, time, cv2, os, sys, math
 import numpy as np
 import asyncio
+import atexit
+import concurrent.futures
+import functools
+import logging
+import logging.handlers
+import queue
+import signal
 from time import sleep
 from enum import Enum, auto
+import threading
 from threading import Lock
 
 from inference import get_model  # Roboflow
@@ -33,10 +41,60 @@ except ImportError:
     XARM_AVAILABLE = False
     print("[WARN] xarm module not found. Arm control will be disabled.")
 
+# Import numba (optional JIT for the per-frame numeric helpers)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    print("[WARN] numba not found. Numeric helpers will run as plain Python.")
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+# Runtime messages (conveyor, system state, arm, trigger) go through a queue
+# drained by a background listener, so stdout writes never stall the caller.
+# Startup banners stay on print().
+log = logging.getLogger("pickplace")
+arm_log = logging.getLogger("pickplace.arm")
+conveyor_log = logging.getLogger("pickplace.conveyor")
+system_log = logging.getLogger("pickplace.system")
+_log_listener = None
+
+
+def setup_logging(level=logging.INFO):
+    """Attach the queue handler to the pickplace loggers and start the listener."""
+    global _log_listener
+    log.setLevel(level)
+    if _log_listener is not None:
+        return _log_listener
+    
+    log_queue = queue.Queue(-1)
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream)
+    
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.propagate = False
+    
+    listener.start()
+    atexit.register(listener.stop)
+    _log_listener = listener
+    return listener
+
+
 # ============================================================================
 # CONVEYOR BELT CONFIGURATION
 # ============================================================================
 CONVEYOR_PLUG_IP = "192.168.137.242"
+CONVEYOR_TIMEOUT_S = 2.0
+CONVEYOR_POLL_INTERVAL_S = 1.0
 GRIP_ROT_SERVO_ID = 2
 GRIP_ROT_NEUTRAL = 500
 GRIP_ROT_MIN = 130
@@ -45,6 +103,17 @@ GRIP_ROT_FIXED = 130
 ROTATION_AFFECTED_STEPS = [1, 2, 3]
 ANGLE_ADJUST_MIN = -35.0
 ANGLE_ADJUST_MAX = 35.0
+SERVO_POS_MIN = 0
+SERVO_POS_MAX = 1000
+ANGLE_ROI_MAX_SIDE = 160
+ANGLE_MIN_MASK_PIXELS = 50
+ANGLE_MIN_ROI_SIDE = 8
+ANGLE_DEBUG_EVERY_N = 3
+ANGLE_CACHE_GRID_SHIFT = 3   # bbox snapped to 8 px cells for the angle cache
+ANGLE_CACHE_MAX = 64
+TEXT_CACHE_MAX = 256
+HUD_REFRESH_S = 0.5           # FPS/latency readout update period
+GRAB_TIMEOUT_S = 2.0          # wait per camera read before logging a stall
 
 # ============================================================================
 # POSITION FINE-TUNING CONFIGURATION
@@ -60,13 +129,44 @@ FINE_TUNE_AFFECTED_STEPS = [1, 2]
 FINE_TUNE_DEADZONE_X = 20
 FINE_TUNE_DEADZONE_Y = 20
 
+# ============================================================================
+# ARM MOTION CONFIGURATION
+# ============================================================================
+ARM_MOVE_TIME_MS = 2000
+ARM_SETTLE_TOL = 10
+ARM_SETTLE_TIMEOUT_S = 1.0
+ARM_SETTLE_POLL_S = 0.02
+
 # ============================================================================
 # OBJECT CATEGORIZATION
 # ============================================================================
-RECYCLABLE_ITEMS = ['plastic_bottle', 'glass_bottle', 'metal-can']
-NON_RECYCLABLE_ITEMS = ['paper cup', 'chips_bag']
-ANGLE_DETECTION_OBJECTS = ['plastic_bottle', 'glass_bottle']
-FIXED_ROTATION_OBJECTS = ['paper cup', 'chips_bag', 'metal-can']
+RECYCLABLE_ITEMS = frozenset({'plastic_bottle', 'glass_bottle', 'metal-can'})
+NON_RECYCLABLE_ITEMS = frozenset({'paper cup', 'chips_bag'})
+ANGLE_DETECTION_OBJECTS = frozenset({'plastic_bottle', 'glass_bottle'})
+FIXED_ROTATION_OBJECTS = frozenset({'paper cup', 'chips_bag', 'metal-can'})
+
+
+def _describe_label(label: str) -> tuple:
+    """(sequence_type, rotation_mode, overlay suffix) for a known label."""
+    # Uncategorised labels (e.g. only in the rotation sets) go to the LEFT box
+    if label in RECYCLABLE_ITEMS or label not in NON_RECYCLABLE_ITEMS:
+        sequence_type = 'left'
+    else:
+        sequence_type = 'right'
+    suffix = " [R]" if sequence_type == 'left' else " [N]"
+    if label in FIXED_ROTATION_OBJECTS:
+        return sequence_type, 'fixed', suffix + f" FIX:{GRIP_ROT_FIXED}"
+    if label in ANGLE_DETECTION_OBJECTS:
+        return sequence_type, 'angle', suffix + " ANG"
+    return sequence_type, 'neutral', suffix
+
+
+# Lower-case label -> (sequence_type, rotation_mode, overlay suffix), so each
+# detection costs one dict lookup instead of several set tests
+_LABEL_INFO = {label: _describe_label(label)
+               for label in (RECYCLABLE_ITEMS | NON_RECYCLABLE_ITEMS
+                             | ANGLE_DETECTION_OBJECTS | FIXED_ROTATION_OBJECTS)}
+_DEFAULT_LABEL_INFO = ('left', 'neutral', " [R]")
 
 # ============================================================================
 # STATE MACHINE
@@ -79,110 +179,161 @@ class SystemState(Enum):
 
 
 # ============================================================================
-# CONVEYOR BELT CONTROL - FIXED WITH CUSTOM EVENT LOOP HANDLER
+# CONVEYOR BELT CONTROL - PERSISTENT EVENT LOOP
 # ============================================================================
 
 class ConveyorController:
     """
-    Fixed conveyor controller with proper asyncio event loop handling.
-    Creates a fresh event loop for each async operation.
+    Conveyor controller backed by a single long-lived SmartPlug.
+    A dedicated daemon thread runs one asyncio event loop for the lifetime
+    of the controller; coroutines are submitted to it thread-safely.
+    A background task refreshes the cached plug state about once per second,
+    so get_state() never touches the network.
     """
     
     def __init__(self, plug_ip: str = "10.0.0.94"):
         self.plug_ip = plug_ip
         self.is_initialized = False
         self._state = None
+        self._loop = None
+        self._plug = None
+        self._plug_lock = None
+        self._poll_task = None
         
         if not KASA_AVAILABLE:
-            print("[CONVEYOR] Kasa module not available")
+            conveyor_log.warning("[CONVEYOR] Kasa module not available")
             return
         
         try:
-            print(f"[CONVEYOR] Initializing smart plug at {plug_ip}")
+            conveyor_log.info("[CONVEYOR] Initializing smart plug at %s", plug_ip)
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, daemon=True).start()
             self._initialize()
             self.is_initialized = True
             
         except Exception as e:
-            print(f"[CONVEYOR] Failed to initialize: {e}")
+            conveyor_log.error("[CONVEYOR] Failed to initialize: %s", e)
             self.is_initialized = False
+            self.close()
     
-    def _run_coro(self, coro):
-        """
-        Run a coroutine with a fresh event loop.
-        This fixes the "Event loop is closed" error.
-        """
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            try:
-                loop.close()
-            except:
-                pass
+    def _run_coro(self, coro, timeout: float = CONVEYOR_TIMEOUT_S):
+        """Run a coroutine on the persistent loop and wait for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout=timeout)
     
     def _initialize(self):
-        """Initialize and test connection to smart plug."""
+        """Create the plug once and prime its cached state."""
         async def init_async():
+            # The lock must be created on the loop that will use it
+            self._plug_lock = asyncio.Lock()
             plug = SmartPlug(self.plug_ip)
             await plug.update()
-            print(f"[CONVEYOR] Connected to: {plug.alias}")
-            print(f"[CONVEYOR] Current state: {'ON' if plug.is_on else 'OFF'}")
-            return plug.is_on
+            conveyor_log.info("[CONVEYOR] Connected to: %s", plug.alias)
+            conveyor_log.info("[CONVEYOR] Current state: %s", "ON" if plug.is_on else "OFF")
+            self._poll_task = asyncio.ensure_future(self._poll_state())
+            return plug
         
-        self._state = self._run_coro(init_async())
+        self._plug = self._run_coro(init_async())
+        self._state = self._plug.is_on
     
-    def start(self) -> bool:
-        """Start the conveyor belt (turn plug ON)."""
-        if not self.is_initialized:
-            print("[CONVEYOR] Not initialized, cannot start")
-            return False
+    async def _poll_state(self):
+        """Refresh the cached ON/OFF state every CONVEYOR_POLL_INTERVAL_S."""
+        while True:
+            await asyncio.sleep(CONVEYOR_POLL_INTERVAL_S)
+            try:
+                async with self._plug_lock:
+                    await self._plug.update()
+                    self._state = self._plug.is_on
+            except Exception as e:
+                conveyor_log.warning("[CONVEYOR] State poll failed: %s", e)
+    
+    async def _turn_on_async(self):
+        async with self._plug_lock:
+            await self._plug.turn_on()
+            self._state = True
+        conveyor_log.info("[CONVEYOR] ✓ Started (Plug ON)")
+        return True
+    
+    async def _turn_off_async(self):
+        async with self._plug_lock:
+            await self._plug.turn_off()
+            self._state = False
+        conveyor_log.info("[CONVEYOR] ✓ Stopped (Plug OFF)")
+        return True
+    
+    def _toggle(self, coro, action: str, wait: bool) -> bool:
+        """Submit a toggle; block for the result only when `wait` is set."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        if not wait:
+            future.add_done_callback(functools.partial(self._report_failure, action))
+            return True
         
         try:
-            async def turn_on():
-                plug = SmartPlug(self.plug_ip)
-                await plug.update()
-                if not plug.is_on:
-                    await plug.turn_on()
-                    await plug.update()
-                return plug.is_on
-            
-            self._state = self._run_coro(turn_on())
-            print("[CONVEYOR] ✓ Started (Plug ON)")
-            return True
-            
+            return future.result(timeout=CONVEYOR_TIMEOUT_S)
         except Exception as e:
-            print(f"[CONVEYOR] Failed to start: {e}")
+            conveyor_log.error("[CONVEYOR] Failed to %s: %s", action, e)
             return False
     
-    def stop(self) -> bool:
-        """Stop the conveyor belt (turn plug OFF)."""
+    @staticmethod
+    def _report_failure(action: str, future):
+        if not future.cancelled() and future.exception() is not None:
+            conveyor_log.error("[CONVEYOR] Failed to %s: %s", action, future.exception())
+    
+    def start(self, wait: bool = False) -> bool:
+        """
+        Start the conveyor belt (turn plug ON).
+        Fire-and-forget by default; with `wait`, returns whether it succeeded.
+        """
         if not self.is_initialized:
-            print("[CONVEYOR] Not initialized, cannot stop")
+            conveyor_log.warning("[CONVEYOR] Not initialized, cannot start")
             return False
-        
-        try:
-            async def turn_off():
-                plug = SmartPlug(self.plug_ip)
-                await plug.update()
-                if plug.is_on:
-                    await plug.turn_off()
-                    await plug.update()
-                return plug.is_on
-            
-            self._state = self._run_coro(turn_off())
-            print("[CONVEYOR] ✓ Stopped (Plug OFF)")
-            return True
-            
-        except Exception as e:
-            print(f"[CONVEYOR] Failed to stop: {e}")
+        return self._toggle(self._turn_on_async(), "start", wait)
+    
+    def stop(self, wait: bool = False) -> bool:
+        """
+        Stop the conveyor belt (turn plug OFF).
+        Fire-and-forget by default; with `wait`, returns whether it succeeded.
+        """
+        if not self.is_initialized:
+            conveyor_log.warning("[CONVEYOR] Not initialized, cannot stop")
             return False
+        return self._toggle(self._turn_off_async(), "stop", wait)
+    
+    def start_async(self):
+        """Submit a turn-on without waiting. Returns a concurrent Future (or None)."""
+        if not self.is_initialized:
+            conveyor_log.warning("[CONVEYOR] Not initialized, cannot start")
+            return None
+        return asyncio.run_coroutine_threadsafe(self._turn_on_async(), self._loop)
+    
+    def stop_async(self):
+        """Submit a turn-off without waiting. Returns a concurrent Future (or None)."""
+        if not self.is_initialized:
+            conveyor_log.warning("[CONVEYOR] Not initialized, cannot stop")
+            return None
+        return asyncio.run_coroutine_threadsafe(self._turn_off_async(), self._loop)
     
     def get_state(self):
-        """Get current conveyor state (cached)."""
+        """Get current conveyor state (cached, never blocks)."""
         if not self.is_initialized:
             return None
         return self._state
+    
+    async def _cancel_poll(self):
+        self._poll_task.cancel()
+        await asyncio.gather(self._poll_task, return_exceptions=True)
+    
+    def close(self):
+        """Stop the state poll and the background event loop."""
+        if self._loop is None:
+            return
+        if self._poll_task is not None:
+            try:
+                self._run_coro(self._cancel_poll())
+            except Exception:
+                pass
+            self._poll_task = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
 
 
 # ============================================================================
@@ -192,11 +343,25 @@ class ConveyorController:
 class ObjectAngleDetector:
     """
     Detects the orientation angle of an object from its bounding box region.
-    Uses contour analysis and moments to estimate the principal axis.
+    Uses the central image moments of the thresholded mask to estimate the
+    principal axis.
     """
     
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, use_opencl=False):
         self.debug = debug
+        self.use_opencl = use_opencl and cv2.ocl.haveOpenCL()
+        if self.use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+        self._dbg_counter = 0
+        # Quantized bbox -> angle for the current inference result only; a
+        # new result may be a different object in the same box
+        self._cache = {}
+        # Scratch buffers reused by every call; crops never exceed
+        # ANGLE_ROI_MAX_SIDE on either side once downscaled
+        side = ANGLE_ROI_MAX_SIDE
+        self._small_buf = np.empty((side, side, 3), dtype=np.uint8)
+        self._gray_buf = np.empty((side, side), dtype=np.uint8)
+        self._bin_buf = np.empty((side, side), dtype=np.uint8)
     
     def detect_angle(self, frame, x1, y1, x2, y2, label="object"):
         """
@@ -212,58 +377,159 @@ class ObjectAngleDetector:
                       0° = horizontal, +90° = vertical pointing up
                       Returns 0.0 if detection fails
         """
-        try:
-            roi = frame[y1:y2, x1:x2].copy()
-            
-            if roi.size == 0:
-                return 0.0
-            
-            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-            
+        g = ANGLE_CACHE_GRID_SHIFT
+        key = (label, int(x1) >> g, int(y1) >> g, int(x2) >> g, int(y2) >> g)
+        angle = self._cache.get(key)
+        if angle is not None:
+            return angle
+        
+        angle = self._measure_angle(frame, x1, y1, x2, y2, label)
+        if len(self._cache) > ANGLE_CACHE_MAX:
+            self._cache.clear()
+        self._cache[key] = angle
+        return angle
+    
+    def reset_cache(self):
+        """Forget cached angles; call whenever new detections arrive."""
+        self._cache.clear()
+    
+    @staticmethod
+    def _work_size(rh, rw):
+        """(width, height) of the crop after capping its long side."""
+        # The principal-axis angle is scale-invariant, so work on a small copy
+        scale = ANGLE_ROI_MAX_SIDE / max(rh, rw)
+        if scale >= 1.0:
+            return rw, rh
+        return (min(ANGLE_ROI_MAX_SIDE, max(1, round(rw * scale))),
+                min(ANGLE_ROI_MAX_SIDE, max(1, round(rh * scale))))
+    
+    def _binarize(self, roi):
+        """Downscale + threshold the crop on the CPU. Returns (crop, mask)."""
+        rh, rw = roi.shape[:2]
+        w, h = self._work_size(rh, rw)
+        if (w, h) != (rw, rh):
+            roi = cv2.resize(roi, (w, h), dst=self._small_buf[:h, :w],
+                             interpolation=cv2.INTER_AREA)
+        
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=self._gray_buf[:h, :w])
+        
+        _, binary = cv2.threshold(
+            gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU,
+            dst=self._bin_buf[:h, :w]
+        )
+        
+        # Fall back to the (slower) local threshold for low-contrast crops
+        if np.count_nonzero(binary) < ANGLE_MIN_MASK_PIXELS:
+            binary = cv2.adaptiveThreshold(
+                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                cv2.THRESH_BINARY_INV, 11, 2, dst=self._bin_buf[:h, :w]
+            )
+        return roi, binary
+    
+    @staticmethod
+    def _object_mask(binary):
+        """
+        Reduce a thresholded crop to the object itself. The global threshold
+        marks whichever class is darker, so for a light object on a dark belt
+        the background comes out as foreground; the class that covers most of
+        the crop border is taken as background and the mask inverted if
+        needed. Only the largest connected blob is kept, like the largest
+        contour in the original minAreaRect path.
+        """
+        border = (np.count_nonzero(binary[0]) + np.count_nonzero(binary[-1]) +
+                  np.count_nonzero(binary[:, 0]) + np.count_nonzero(binary[:, -1]))
+        if 2 * border > 2 * (binary.shape[0] + binary.shape[1]):
+            cv2.bitwise_not(binary, dst=binary)
+        
+        n, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        if n <= 2:
+            return binary
+        largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+        return cv2.compare(labels, largest, cv2.CMP_EQ)
+    
+    def _binarize_ocl(self, roi):
+        """Same as _binarize, but through the T-API so OpenCL runs the kernels."""
+        rh, rw = roi.shape[:2]
+        w, h = self._work_size(rh, rw)
+        roi = cv2.UMat(roi)
+        if (w, h) != (rw, rh):
+            roi = cv2.resize(roi, (w, h), interpolation=cv2.INTER_AREA)
+        
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        if cv2.countNonZero(binary) < ANGLE_MIN_MASK_PIXELS:
             binary = cv2.adaptiveThreshold(
                 gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
                 cv2.THRESH_BINARY_INV, 11, 2
             )
-            
+        return roi, binary.get()
+    
+    def _measure_angle(self, frame, x1, y1, x2, y2, label):
+        """Principal-axis angle of the thresholded bbox crop (uncached)."""
+        h, w = frame.shape[:2]
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w, x2), min(h, y2)
+        if x2 - x1 < ANGLE_MIN_ROI_SIDE or y2 - y1 < ANGLE_MIN_ROI_SIDE:
+            return 0.0
+        
+        roi = frame[y1:y2, x1:x2]
+        if self.use_opencl:
+            roi, binary = self._binarize_ocl(roi)
+        else:
+            roi, binary = self._binarize(roi)
+        binary = self._object_mask(binary)
+        
+        m = cv2.moments(binary, binaryImage=True)
+        if m['m00'] < ANGLE_MIN_MASK_PIXELS:
+            return 0.0
+        
+        # atan2 already resolves the major/minor axis (mu20 vs mu02),
+        # so the result lands in [-90, 90] without further folding
+        angle = math.degrees(0.5 * math.atan2(2.0 * m['mu11'], m['mu20'] - m['mu02']))
+        
+        if self.debug:
+            self._dbg_counter += 1
+        
+        # Only refresh the debug window every Nth call to keep GUI work off
+        # the detection path
+        if self.debug and self._dbg_counter % ANGLE_DEBUG_EVERY_N == 0:
             contours, _ = cv2.findContours(
                 binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
             )
-            
-            if not contours:
-                return 0.0
-            
-            largest_contour = max(contours, key=cv2.contourArea)
-            
-            rect = cv2.minAreaRect(largest_contour)
-            angle = rect[2]
-            
-            (w, h) = rect[1]
-            if w < h:
-                angle = angle + 90
-            
-            if angle > 90:
-                angle = angle - 180
-            elif angle < -90:
-                angle = angle + 180
-            
-            if self.debug:
-                box = cv2.boxPoints(rect)
-                box = np.int0(box)
-                debug_roi = roi.copy()
+            if contours:
+                largest_contour = max(contours, key=cv2.contourArea)
+                peri = cv2.arcLength(largest_contour, True)
+                approx = cv2.approxPolyDP(largest_contour, 0.01 * peri, True)
+                rect = cv2.minAreaRect(approx)
+                box = cv2.boxPoints(rect).astype(np.intp)
+                debug_roi = roi.get() if isinstance(roi, cv2.UMat) else roi.copy()
                 cv2.drawContours(debug_roi, [box], 0, (0, 255, 0), 2)
                 cv2.imshow(f"Angle Debug: {label}", debug_roi)
-            
-            return float(angle)
-            
-        except Exception as e:
-            print(f"[WARN] Angle detection failed: {e}")
-            return 0.0
+        
+        return float(angle)
 
 
 # ============================================================================
 # POSITION FINE-TUNING
 # ============================================================================
 
+@njit(cache=True)
+def _calc_adj(u, v, cx, cy, h_f, h_max, v_f, v_max, dz_x, dz_y):
+    """Pixel offset from center -> (offset_x, offset_y, h_adjust, v_adjust)."""
+    # Plain scalar branches: for two values, compiled code beats the
+    # np.where/np.clip 2-vector pass this replaced, which allocated
+    # temporaries on every call
+    ox = u - cx
+    oy = v - cy
+    if abs(ox) < dz_x:
+        ox = 0
+    if abs(oy) < dz_y:
+        oy = 0
+    h_adj = max(-h_max, min(h_max, int(ox * h_f)))
+    v_adj = max(-v_max, min(v_max, int(oy * v_f)))
+    return ox, oy, h_adj, v_adj
+
+
 class PositionFineTuner:
     """
     Calculates servo adjustments to compensate for object position offsets.
@@ -280,7 +546,14 @@ class PositionFineTuner:
         self.v_max = FINE_TUNE_VERTICAL_MAX
         self.deadzone_x = FINE_TUNE_DEADZONE_X
         self.deadzone_y = FINE_TUNE_DEADZONE_Y
-        self.affected_steps = FINE_TUNE_AFFECTED_STEPS
+        self.affected_steps = np.asarray(FINE_TUNE_AFFECTED_STEPS, dtype=np.intp)
+        # Scaling/limit arguments for _calc_adj, typed once so the jitted
+        # helper always sees the same signature
+        self._calc_args = (
+            float(self.h_factor), int(self.h_max),
+            float(self.v_factor), int(self.v_max),
+            int(self.deadzone_x), int(self.deadzone_y),
+        )
     
     def calculate_adjustments(self, object_u: int, object_v: int, 
                             center_x: int, center_y: int) -> dict:
@@ -296,19 +569,9 @@ class PositionFineTuner:
                 'v_adjust': 0
             }
         
-        offset_x = object_u - center_x
-        offset_y = object_v - center_y
-        
-        if abs(offset_x) < self.deadzone_x:
-            offset_x = 0
-        if abs(offset_y) < self.deadzone_y:
-            offset_y = 0
-        
-        h_adjust = int(offset_x * self.h_factor)
-        v_adjust = int(offset_y * self.v_factor)
-        
-        h_adjust = max(-self.h_max, min(self.h_max, h_adjust))
-        v_adjust = max(-self.v_max, min(self.v_max, v_adjust))
+        offset_x, offset_y, h_adjust, v_adjust = _calc_adj(
+            int(object_u), int(object_v), int(center_x), int(center_y),
+            *self._calc_args)
         
         return {
             'enabled': True,
@@ -320,74 +583,80 @@ class PositionFineTuner:
             'v_adjust': v_adjust
         }
     
-    def apply_adjustments(self, sequence: list, adjustments: dict) -> list:
-        """Apply calculated adjustments to the arm sequence."""
-        if not adjustments['enabled']:
+    def apply_adjustments(self, sequence: np.ndarray, adjustments: dict) -> np.ndarray:
+        """Apply calculated adjustments to the (n_steps, n_servos) arm sequence in place."""
+        h_adjust = adjustments['h_adjust']
+        v_adjust = adjustments['v_adjust']
+        if not adjustments['enabled'] or (h_adjust == 0 and v_adjust == 0):
             return sequence
         
-        for step_idx in self.affected_steps:
-            if step_idx >= len(sequence):
-                continue
-            
-            if adjustments['h_adjust'] != 0:
-                servo_idx = adjustments['h_servo'] - 1
-                if 0 <= servo_idx < len(sequence[step_idx]):
-                    old_val = sequence[step_idx][servo_idx]
-                    new_val = old_val + adjustments['h_adjust']
-                    sequence[step_idx][servo_idx] = new_val
-            
-            if adjustments['v_adjust'] != 0:
-                servo_idx = adjustments['v_servo'] - 1
-                if 0 <= servo_idx < len(sequence[step_idx]):
-                    old_val = sequence[step_idx][servo_idx]
-                    new_val = old_val + adjustments['v_adjust']
-                    sequence[step_idx][servo_idx] = new_val
+        steps = self.affected_steps[self.affected_steps < sequence.shape[0]]
+        if h_adjust:
+            sequence[steps, adjustments['h_servo'] - 1] += h_adjust
+        if v_adjust:
+            sequence[steps, adjustments['v_servo'] - 1] += v_adjust
+        np.clip(sequence, SERVO_POS_MIN, SERVO_POS_MAX, out=sequence)
         
         return sequence
     
     def print_adjustments(self, adjustments: dict):
         """Print human-readable adjustment info."""
         if not adjustments['enabled']:
-            print("[FINE-TUNE] Disabled")
+            arm_log.debug("[FINE-TUNE] Disabled")
             return
         
-        print(f"[FINE-TUNE] === Position Adjustments ===")
-        print(f"[FINE-TUNE] Offset: X={adjustments['offset_x']:+4d}px, Y={adjustments['offset_y']:+4d}px")
+        arm_log.debug("[FINE-TUNE] === Position Adjustments ===")
+        arm_log.debug("[FINE-TUNE] Offset: X=%+4dpx, Y=%+4dpx",
+                      adjustments['offset_x'], adjustments['offset_y'])
         
         if adjustments['h_adjust'] != 0:
-            print(f"[FINE-TUNE] Horizontal: Servo {adjustments['h_servo']} {adjustments['h_adjust']:+4d} units")
+            arm_log.debug("[FINE-TUNE] Horizontal: Servo %d %+4d units",
+                          adjustments['h_servo'], adjustments['h_adjust'])
         else:
-            print(f"[FINE-TUNE] Horizontal: No adjustment (within deadzone)")
+            arm_log.debug("[FINE-TUNE] Horizontal: No adjustment (within deadzone)")
         
         if adjustments['v_adjust'] != 0:
-            print(f"[FINE-TUNE] Vertical: Servo {adjustments['v_servo']} {adjustments['v_adjust']:+4d} units")
+            arm_log.debug("[FINE-TUNE] Vertical: Servo %d %+4d units",
+                          adjustments['v_servo'], adjustments['v_adjust'])
         else:
-            print(f"[FINE-TUNE] Vertical: No adjustment (within deadzone)")
+            arm_log.debug("[FINE-TUNE] Vertical: No adjustment (within deadzone)")
+
+
+# Configuration is static, so one tuner is shared by every pick
+_FINE_TUNER = PositionFineTuner()
+
+if NUMBA_AVAILABLE:
+    # Compile now rather than on the first pick
+    _FINE_TUNER.calculate_adjustments(0, 0, 0, 0)
 
 
 # ============================================================================
 # ANGLE TO SERVO MAPPING
 # ============================================================================
 
+_ANGLE_X = np.array([-90.0, 0.0, 90.0])
+_ANGLE_Y = np.array([GRIP_ROT_MIN, GRIP_ROT_NEUTRAL, GRIP_ROT_MAX], dtype=np.float64)
+
+
+def angle_to_servo_batch(angles_deg) -> np.ndarray:
+    """Map an array of angles (in degrees) to servo position values."""
+    return np.rint(np.interp(angles_deg, _ANGLE_X, _ANGLE_Y)).astype(np.int16)
+
+
+# Servo value for every whole degree in [-90, 90]
+_SERVO_LUT = angle_to_servo_batch(np.arange(-90, 91))
+
+
 def angle_to_servo(angle_deg: float) -> int:
-    """Map object angle (in degrees) to servo position value."""
-    angle_deg = max(-90.0, min(90.0, angle_deg))
-    
-    if angle_deg >= 0:
-        ratio = angle_deg / 90.0
-        servo_val = GRIP_ROT_NEUTRAL + (GRIP_ROT_MAX - GRIP_ROT_NEUTRAL) * ratio
-    else:
-        ratio = angle_deg / 90.0
-        servo_val = GRIP_ROT_NEUTRAL + (GRIP_ROT_NEUTRAL - GRIP_ROT_MIN) * ratio
-    
-    return int(round(servo_val))
+    """Map object angle (in degrees, rounded to a whole degree) to servo position value."""
+    return int(_SERVO_LUT[min(180, max(0, int(round(angle_deg)) + 90))])
 
 
 # ============================================================================
 # ARM SEQUENCES - LEFT AND RIGHT BOXES
 # ============================================================================
 
-BASE_ARM_SEQUENCE_LEFT = [
+BASE_ARM_SEQUENCE_LEFT = np.array([
     [100, 500, 300, 900, 700, 500],
     [100, 500, 150, 660, 310, 500],
     [600, 500, 150, 660, 310, 500],
@@ -397,9 +666,9 @@ BASE_ARM_SEQUENCE_LEFT = [
     [250, 500, 125, 800, 475, 1000],
     [250, 500, 125, 900, 700, 1000],
     [250, 500, 300, 900, 700, 500]
-]
+], dtype=np.int16)
 
-BASE_ARM_SEQUENCE_RIGHT = [
+BASE_ARM_SEQUENCE_RIGHT = np.array([
     [250, 500, 300, 900, 700, 500],
     [250, 500, 150, 660, 310, 500],
     [600, 500, 150, 660, 310, 500],
@@ -409,65 +678,88 @@ BASE_ARM_SEQUENCE_RIGHT = [
     [250, 500, 125, 800, 475, 0],
     [250, 500, 125, 900, 700, 0],
     [250, 500, 300, 900, 700, 500]
-]
+], dtype=np.int16)
+
+SERVO_IDS = np.arange(1, BASE_ARM_SEQUENCE_LEFT.shape[1] + 1, dtype=np.int16)
+
+
+def pack_sequence(sequence: np.ndarray) -> list:
+    """Convert an (n_steps, n_servos) array to per-step setPosition commands."""
+    ids = np.broadcast_to(SERVO_IDS, sequence.shape)
+    return np.dstack((ids, sequence)).tolist()
 
 
 # ============================================================================
 # DYNAMIC SEQUENCE BUILDER
 # ============================================================================
 
-def build_pick_sequence(label: str, object_angle_deg: float, sequence_type: str,
-                       object_u: int, object_v: int, center_x: int, center_y: int) -> list:
-    """Build a dynamic pick sequence with gripper rotation and position fine-tuning."""
+@functools.lru_cache(maxsize=16)
+def _base_with_rotation(sequence_type: str, rotation_value: int) -> np.ndarray:
+    """Read-only base sequence with the gripper rotation already written in."""
     if sequence_type == 'right':
-        base_sequence = BASE_ARM_SEQUENCE_RIGHT
-        box_name = "RIGHT (Non-recyclable)"
+        sequence = BASE_ARM_SEQUENCE_RIGHT.copy()
     else:
-        base_sequence = BASE_ARM_SEQUENCE_LEFT
-        box_name = "LEFT (Recyclable)"
+        sequence = BASE_ARM_SEQUENCE_LEFT.copy()
     
-    print(f"[SEQUENCE] Using {box_name} box sequence")
-    
-    sequence = [step.copy() for step in base_sequence]
+    sequence[ROTATION_AFFECTED_STEPS, GRIP_ROT_SERVO_ID - 1] = rotation_value
+    sequence.setflags(write=False)
+    return sequence
+
+
+def build_pick_sequence(label: str, object_angle_deg: float, sequence_type: str,
+                       object_u: int, object_v: int, center_x: int, center_y: int) -> list:
+    """
+    Build a dynamic pick sequence with gripper rotation and position fine-tuning.
+    Returns one [[servo_id, pos], ...] command list per step, ready for
+    arm.setPosition.
+    """
+    # Per-pick traces are DEBUG; the level check skips them all in quiet mode
+    debug = arm_log.isEnabledFor(logging.DEBUG)
+    if debug:
+        arm_log.debug("[SEQUENCE] Using %s box sequence",
+                      "RIGHT (Non-recyclable)" if sequence_type == 'right' else "LEFT (Recyclable)")
     
-    label_lower = label.lower()
+    rotation_mode = _LABEL_INFO.get(label.lower(), _DEFAULT_LABEL_INFO)[1]
     
-    if label_lower in FIXED_ROTATION_OBJECTS:
+    if rotation_mode == 'fixed':
         rotation_value = GRIP_ROT_FIXED
-        print(f"[SEQUENCE] Object: {label} → Using FIXED rotation")
-        print(f"[SEQUENCE] → Gripper: Servo {GRIP_ROT_SERVO_ID} = {rotation_value} (FIXED)")
+        if debug:
+            arm_log.debug("[SEQUENCE] Object: %s → Using FIXED rotation", label)
+            arm_log.debug("[SEQUENCE] → Gripper: Servo %d = %d (FIXED)", GRIP_ROT_SERVO_ID, rotation_value)
         
-    elif label_lower in ANGLE_DETECTION_OBJECTS:
+    elif rotation_mode == 'angle':
         if ANGLE_ADJUST_MIN <= object_angle_deg <= ANGLE_ADJUST_MAX:
             rotation_value = angle_to_servo(object_angle_deg)
-            print(f"[SEQUENCE] Object: {label} (bottle) → Using ANGLE-BASED rotation")
-            print(f"[SEQUENCE] Object angle: {object_angle_deg:.1f}° (within range)")
-            print(f"[SEQUENCE] → Adjusting gripper: Servo {GRIP_ROT_SERVO_ID} = {rotation_value}")
+            if debug:
+                arm_log.debug("[SEQUENCE] Object: %s (bottle) → Using ANGLE-BASED rotation", label)
+                arm_log.debug("[SEQUENCE] Object angle: %.1f° (within range)", object_angle_deg)
+                arm_log.debug("[SEQUENCE] → Adjusting gripper: Servo %d = %d", GRIP_ROT_SERVO_ID, rotation_value)
         else:
             rotation_value = GRIP_ROT_NEUTRAL
-            print(f"[SEQUENCE] Object: {label} (bottle) → Using NEUTRAL rotation")
-            print(f"[SEQUENCE] Object angle: {object_angle_deg:.1f}° (outside range)")
-            print(f"[SEQUENCE] → Using neutral gripper position: Servo {GRIP_ROT_SERVO_ID} = {rotation_value}")
+            if debug:
+                arm_log.debug("[SEQUENCE] Object: %s (bottle) → Using NEUTRAL rotation", label)
+                arm_log.debug("[SEQUENCE] Object angle: %.1f° (outside range)", object_angle_deg)
+                arm_log.debug("[SEQUENCE] → Using neutral gripper position: Servo %d = %d",
+                              GRIP_ROT_SERVO_ID, rotation_value)
     else:
         rotation_value = GRIP_ROT_NEUTRAL
-        print(f"[SEQUENCE] Object: {label} (unknown) → Using NEUTRAL rotation")
-        print(f"[SEQUENCE] → Gripper: Servo {GRIP_ROT_SERVO_ID} = {rotation_value}")
-    
-    servo_index = GRIP_ROT_SERVO_ID - 1
+        if debug:
+            arm_log.debug("[SEQUENCE] Object: %s (unknown) → Using NEUTRAL rotation", label)
+            arm_log.debug("[SEQUENCE] → Gripper: Servo %d = %d", GRIP_ROT_SERVO_ID, rotation_value)
     
-    for step_idx in ROTATION_AFFECTED_STEPS:
-        if 0 <= step_idx < len(sequence):
-            sequence[step_idx][servo_index] = rotation_value
-            print(f"[SEQUENCE] Step {step_idx}: Set servo {GRIP_ROT_SERVO_ID} to {rotation_value}")
+    sequence = _base_with_rotation(sequence_type, rotation_value).copy()
+    if debug:
+        arm_log.debug("[SEQUENCE] Steps %s: Set servo %d to %d",
+                      ROTATION_AFFECTED_STEPS, GRIP_ROT_SERVO_ID, rotation_value)
     
-    fine_tuner = PositionFineTuner()
-    adjustments = fine_tuner.calculate_adjustments(object_u, object_v, center_x, center_y)
-    fine_tuner.print_adjustments(adjustments)
+    adjustments = _FINE_TUNER.calculate_adjustments(object_u, object_v, center_x, center_y)
+    if debug:
+        _FINE_TUNER.print_adjustments(adjustments)
     
     if adjustments['enabled']:
-        sequence = fine_tuner.apply_adjustments(sequence, adjustments)
+        sequence = _FINE_TUNER.apply_adjustments(sequence, adjustments)
     
-    return sequence
+    return pack_sequence(sequence)
 
 
 # ============================================================================
@@ -477,14 +769,36 @@ def build_pick_sequence(label: str, object_angle_deg: float, sequence_type: str,
 def get_sequence_type_for_label(label: str) -> str:
     """Determine which box sequence to use based on object label."""
     label_lower = label.lower()
-    
-    if label_lower in RECYCLABLE_ITEMS:
-        return 'left'
-    elif label_lower in NON_RECYCLABLE_ITEMS:
-        return 'right'
-    else:
-        print(f"[WARN] Unknown label '{label}', defaulting to LEFT box")
+    if label_lower not in RECYCLABLE_ITEMS and label_lower not in NON_RECYCLABLE_ITEMS:
+        log.warning("[WARN] Unknown label '%s', defaulting to LEFT box", label)
         return 'left'
+    return _LABEL_INFO[label_lower][0]
+
+
+# ============================================================================
+# ARM MOTION COMPLETION
+# ============================================================================
+
+def wait_until_settled(arm, step_cmd, tol: int = ARM_SETTLE_TOL,
+                       timeout: float = ARM_SETTLE_TIMEOUT_S) -> bool:
+    """
+    Poll servo feedback until every servo in `step_cmd` ([[servo_id, pos], ...])
+    is within `tol` units of its target.
+    Returns True once settled, False if `timeout` expires first.
+    Raises whatever arm.getPosition raises when feedback is unavailable.
+    """
+    cmd = np.asarray(step_cmd, dtype=np.int32)
+    servo_ids = cmd[:, 0].tolist()
+    target = cmd[:, 1]
+    deadline = time.monotonic() + timeout
+    
+    while True:
+        current = np.asarray(arm.getPosition(servo_ids), dtype=np.int32)
+        if np.max(np.abs(current - target)) < tol:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        sleep(ARM_SETTLE_POLL_S)
 
 
 # ============================================================================
@@ -494,7 +808,9 @@ def get_sequence_type_for_label(label: str) -> str:
 class SystemController:
     """
     Central state machine that coordinates conveyor and arm actions.
-    Ensures only one pick sequence can run at a time.
+    Ensures only one pick sequence can run at a time. Picks run on a
+    single background worker, so the detection loop keeps running (and the
+    preview keeps updating) while the arm moves.
     """
     
     def __init__(self, conveyor, arm):
@@ -502,120 +818,177 @@ class SystemController:
         self.arm = arm
         self.state = SystemState.IDLE
         self.lock = Lock()
-        self._last_pick_time = 0.0
+        self._last_pick_time = float("-inf")
+        self._arm_feedback = True
+        self._abort = threading.Event()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="pick")
         
         if self.conveyor and self.conveyor.is_initialized:
-            print("[SYSTEM] Starting conveyor in IDLE state...")
+            system_log.info("[SYSTEM] Starting conveyor in IDLE state...")
             self.conveyor.start()
     
     def can_trigger_pick(self, cooldown_s: float) -> bool:
-        """Check if system is ready for a new pick action."""
-        with self.lock:
-            if self.state != SystemState.IDLE:
-                return False
-            
-            now = time.time()
-            if now - self._last_pick_time < cooldown_s:
-                return False
-            
-            return True
+        """
+        Check if system is ready for a new pick action.
+        Lock-free pre-check: attribute reads are atomic, and
+        execute_pick_sequence re-checks the state under the lock before
+        claiming the arm.
+        """
+        return (self.state is SystemState.IDLE and
+                time.monotonic() - self._last_pick_time >= cooldown_s)
     
     def execute_pick_sequence(self, label: str, u: int, v: int, conf: float,
                              object_angle_deg: float, center_x: int, center_y: int,
                              cooldown_s: float):
-        """Execute a pick sequence with proper state management."""
+        """
+        Claim the arm and start a pick sequence on the pick worker.
+        Returns False if the system is not IDLE, otherwise True without
+        waiting for the pick to finish.
+        """
         with self.lock:
-            if self.state != SystemState.IDLE:
-                print(f"[SYSTEM] Cannot pick - state is {self.state.name}")
+            if self.state != SystemState.IDLE or self._abort.is_set():
+                system_log.info("[SYSTEM] Cannot pick - state is %s", self.state.name)
                 return False
             
             self.state = SystemState.PICKING
-            print(f"[SYSTEM] State: IDLE → PICKING")
+            system_log.info("[SYSTEM] State: IDLE → PICKING")
         
+        self._executor.submit(self._run_pick, label, u, v, conf, object_angle_deg,
+                              center_x, center_y)
+        return True
+    
+    def _run_pick(self, label: str, u: int, v: int, conf: float,
+                  object_angle_deg: float, center_x: int, center_y: int) -> bool:
+        """Run one pick (state is already PICKING), then cool down back to IDLE."""
+        restart_future = None
         try:
+            stop_future = None
             if self.conveyor and self.conveyor.is_initialized:
-                print("[SYSTEM] Stopping conveyor...")
-                success = self.conveyor.stop()
-                if not success:
-                    print("[ERROR] Failed to stop conveyor!")
-                    return False
-                sleep(0.5)
+                system_log.info("[SYSTEM] Stopping conveyor...")
+                stop_future = self.conveyor.stop_async()
             
-            self._run_arm_sequence(label, u, v, conf, object_angle_deg, 
-                                  center_x, center_y)
+            restart_future = self._run_arm_sequence(label, u, v, conf, object_angle_deg,
+                                                    center_x, center_y, stop_future)
             
-            print("[SYSTEM] ✓ Pick sequence complete")
+            system_log.info("[SYSTEM] ✓ Pick sequence complete")
             return True
             
         except Exception as e:
-            print(f"[ERROR] Pick sequence failed: {e}")
-            import traceback
-            traceback.print_exc()
+            if self._abort.is_set():
+                system_log.warning("[SYSTEM] Pick aborted")
+            else:
+                system_log.exception("[ERROR] Pick sequence failed: %s", e)
             return False
             
         finally:
             with self.lock:
-                self._last_pick_time = time.time()
+                self._last_pick_time = time.monotonic()
                 self.state = SystemState.COOLDOWN
-                print(f"[SYSTEM] State: PICKING → COOLDOWN")
+                system_log.info("[SYSTEM] State: PICKING → COOLDOWN")
             
-            if self.conveyor and self.conveyor.is_initialized:
-                print("[SYSTEM] Restarting conveyor...")
-                success = self.conveyor.start()
+            # After an emergency stop the conveyor stays off
+            if (self.conveyor and self.conveyor.is_initialized and
+                    not self._abort.is_set()):
+                if restart_future is None:
+                    system_log.info("[SYSTEM] Restarting conveyor...")
+                    restart_future = self.conveyor.start_async()
+                success = self._wait_conveyor(restart_future, "restart")
                 if not success:
-                    print("[ERROR] Failed to restart conveyor!")
+                    system_log.error("[ERROR] Failed to restart conveyor!")
                     sleep(0.5)
-                    success = self.conveyor.start()
+                    success = self.conveyor.start(wait=True)
                     if success:
-                        print("[SYSTEM] ✓ Conveyor restart successful on retry")
+                        system_log.info("[SYSTEM] ✓ Conveyor restart successful on retry")
                     else:
-                        print("[ERROR] Conveyor restart failed even after retry!")
+                        system_log.error("[ERROR] Conveyor restart failed even after retry!")
                 sleep(0.3)
             
             with self.lock:
                 self.state = SystemState.IDLE
-                print(f"[SYSTEM] State: COOLDOWN → IDLE")
+                system_log.info("[SYSTEM] State: COOLDOWN → IDLE")
+    
+    def _wait_conveyor(self, future, action: str) -> bool:
+        """Wait for a submitted conveyor toggle to finish."""
+        if future is None:
+            return False
+        try:
+            return bool(future.result(timeout=CONVEYOR_TIMEOUT_S))
+        except Exception as e:
+            system_log.error("[ERROR] Conveyor %s failed: %s", action, e)
+            return False
+    
+    def _start_conveyor_early(self):
+        """Kick off the conveyor restart so it overlaps the final arm move."""
+        if self.conveyor and self.conveyor.is_initialized:
+            system_log.info("[SYSTEM] Restarting conveyor...")
+            return self.conveyor.start_async()
+        return None
     
     def _run_arm_sequence(self, label, u, v, conf, object_angle_deg, 
-                         center_x, center_y):
-        """Execute the actual arm movement sequence."""
+                         center_x, center_y, stop_future=None):
+        """
+        Execute the actual arm movement sequence.
+        
+        The conveyor stop submitted by the caller overlaps the Home move and
+        must have completed before Reach. The conveyor restart is submitted
+        before the final Home move; its Future is returned to the caller.
+        """
         sequence_type = get_sequence_type_for_label(label)
         
-        print(f"\n[ARM] === PICK SEQUENCE ===")
-        print(f"[ARM] Target: {label} at ({u}, {v})")
-        print(f"[ARM] Confidence: {conf:.2%}")
-        print(f"[ARM] Angle: {object_angle_deg:.1f}°")
-        print(f"[ARM] Box: {'LEFT (Recyclable)' if sequence_type == 'left' else 'RIGHT (Non-recyclable)'}")
+        arm_log.info("\n[ARM] === PICK SEQUENCE ===")
+        arm_log.info("[ARM] Target: %s at (%d, %d)", label, u, v)
+        arm_log.debug("[ARM] Confidence: %.2f%%", conf * 100)
+        arm_log.debug("[ARM] Angle: %.1f°", object_angle_deg)
+        arm_log.info("[ARM] Box: %s",
+                     'LEFT (Recyclable)' if sequence_type == 'left' else 'RIGHT (Non-recyclable)')
         
         if not XARM_AVAILABLE or self.arm is None:
-            print("[WARN] xArm not available. Simulating movement...")
-            sleep(3)
-            return
+            if stop_future is not None and not self._wait_conveyor(stop_future, "stop"):
+                raise RuntimeError("Failed to stop conveyor")
+            arm_log.warning("[WARN] xArm not available. Simulating movement...")
+            if self._abort.wait(3):
+                raise RuntimeError("Pick aborted by emergency stop")
+            return self._start_conveyor_early()
         
+        restart_future = None
         try:
             dynamic_sequence = build_pick_sequence(
                 label, object_angle_deg, sequence_type,
                 u, v, center_x, center_y
             )
             
-            print("[ARM] Executing sequence...")
+            arm_log.debug("[ARM] Executing sequence...")
             step_names = ["Home", "Reach", "Grip", "Lift", "Rotate", 
                          "Position", "Release", "Retract", "Home"]
+            last_idx = len(dynamic_sequence) - 1
+            prev_step = None
             
-            for idx, step in enumerate(dynamic_sequence):
+            for idx, step_cmd in enumerate(dynamic_sequence):
+                if self._abort.is_set():
+                    raise RuntimeError("Pick aborted by emergency stop")
+                if idx == 1 and stop_future is not None:
+                    if not self._wait_conveyor(stop_future, "stop"):
+                        raise RuntimeError("Failed to stop conveyor")
+                if idx == last_idx and idx > 0:
+                    restart_future = self._start_conveyor_early()
+                
                 step_name = step_names[idx] if idx < len(step_names) else f"Step {idx}"
-                print(f"[ARM] → {step_name}")
+                arm_log.debug("[ARM] → %s", step_name)
                 
-                self.arm.setPosition(
-                    [[i+1, pos] for i, pos in enumerate(step)],
-                    2000
-                )
-                sleep(1)
+                self.arm.setPosition(step_cmd, ARM_MOVE_TIME_MS)
+                # The last move has to finish before servoOff below releases
+                # the servos, so it may take the full move time
+                if idx == last_idx:
+                    self._wait_for_step(step_cmd, prev_step, ARM_MOVE_TIME_MS / 1000.0)
+                else:
+                    self._wait_for_step(step_cmd, prev_step)
+                prev_step = step_cmd
             
-            sleep(1)
+            return restart_future
             
         except Exception as e:
-            print(f"[ERROR] Arm control failed: {e}")
+            arm_log.error("[ERROR] Arm control failed: %s", e)
             raise
         finally:
             try:
@@ -623,6 +996,25 @@ class SystemController:
             except:
                 pass
     
+    def _wait_for_step(self, step_cmd, prev_cmd, timeout: float = ARM_SETTLE_TIMEOUT_S):
+        """
+        Wait up to `timeout` seconds for the arm to reach `step_cmd`. Uses
+        servo feedback when the arm reports positions; otherwise sleeps the
+        full timeout, skipping it for steps that do not move any servo.
+        """
+        if self._arm_feedback:
+            try:
+                wait_until_settled(self.arm, step_cmd, timeout=timeout)
+                return
+            except Exception as e:
+                arm_log.warning("[WARN] No servo position feedback (%s), using fixed delays", e)
+                self._arm_feedback = False
+        
+        moving = (prev_cmd is None or
+                  np.max(np.abs(np.subtract(step_cmd, prev_cmd))) > ARM_SETTLE_TOL)
+        if moving:
+            sleep(timeout)
+    
     def get_state(self) -> SystemState:
         """Get current system state (thread-safe)."""
         with self.lock:
@@ -630,12 +1022,15 @@ class SystemController:
     
     def emergency_stop(self):
         """Emergency stop - turn off conveyor and arm."""
-        print("[SYSTEM] !!! EMERGENCY STOP !!!")
+        system_log.warning("[SYSTEM] !!! EMERGENCY STOP !!!")
+        # Let a running pick stop at its next step before the servos go off
+        self._abort.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
         with self.lock:
             self.state = SystemState.IDLE
         
         if self.conveyor and self.conveyor.is_initialized:
-            self.conveyor.stop()
+            self.conveyor.stop(wait=True)
         
         if self.arm:
             try:
@@ -648,47 +1043,55 @@ class SystemController:
 # ROI-PRIORITY BEST HIT SELECTION
 # ============================================================================
 
-def is_in_roi(u: int, v: int, cx: int, cy: int, rx: int, ry: int) -> bool:
-    """Check if a point (u, v) is inside the ROI."""
-    return (cx - rx) <= u <= (cx + rx) and (cy - ry) <= v <= (cy + ry)
+def roi_mask(boxes: np.ndarray, cx: int, cy: int, rx: int, ry: int) -> np.ndarray:
+    """Boolean mask of the boxes (xyxy int32[N, 4]) whose centre is inside the ROI."""
+    centers = (boxes[:, :2] + boxes[:, 2:]) // 2
+    return (np.abs(centers[:, 0] - cx) <= rx) & (np.abs(centers[:, 1] - cy) <= ry)
+
+
+@njit(cache=True)
+def _best_hit(confs, in_roi):
+    """
+    One pass over the detections: index of the most confident one inside the
+    ROI, or of the most confident overall if none is. Returns (index, in_roi).
+    """
+    best_roi = -1
+    best_any = -1
+    for i in range(confs.shape[0]):
+        if best_any < 0 or confs[i] > confs[best_any]:
+            best_any = i
+        if in_roi[i] and (best_roi < 0 or confs[i] > confs[best_roi]):
+            best_roi = i
+    if best_roi >= 0:
+        return best_roi, True
+    return best_any, False
+
+
+if NUMBA_AVAILABLE:
+    _best_hit(np.zeros(1, dtype=np.float32), np.zeros(1, dtype=np.bool_))
 
 
-def select_best_hit_with_roi_priority(detections: list, cx: int, cy: int, 
-                                      rx: int, ry: int) -> dict:
-    """Select the best detection with ROI priority."""
-    if not detections:
+def select_best_hit_with_roi_priority(detections: tuple, in_roi: np.ndarray) -> dict:
+    """Select the best detection with ROI priority.
+
+    detections: (xyxy, conf, labels) as published by InferenceWorker.
+    in_roi: roi_mask() of the same boxes, shared with the overlay.
+    """
+    boxes, confs, labels = detections
+    if not labels:
         return None
     
-    roi_detections = []
-    all_detections = []
-    
-    for x1, y1, x2, y2, conf, label in detections:
-        u = (x1 + x2) // 2
-        v = (y1 + y2) // 2
-        in_roi = is_in_roi(u, v, cx, cy, rx, ry)
-        
-        detection_info = {
-            "label": label,
-            "conf": float(conf),
-            "u": u,
-            "v": v,
-            "bbox": (x1, y1, x2, y2),
-            "in_roi": in_roi
-        }
-        
-        all_detections.append(detection_info)
-        if in_roi:
-            roi_detections.append(detection_info)
-    
-    if roi_detections:
-        best_hit = max(roi_detections, key=lambda d: d["conf"])
-        return best_hit
-    
-    if all_detections:
-        best_hit = max(all_detections, key=lambda d: d["conf"])
-        return best_hit
-    
-    return None
+    best, in_roi = _best_hit(confs, in_roi)
+    x1, y1, x2, y2 = boxes[best].tolist()
+    return {
+        "label": labels[best],
+        "conf": float(confs[best]),
+        "u": (x1 + x2) // 2,
+        "v": (y1 + y2) // 2,
+        "bbox": (x1, y1, x2, y2),
+        "in_roi": bool(in_roi),
+        "index": int(best)
+    }
 
 
 # ============================================================================
@@ -696,21 +1099,28 @@ def select_best_hit_with_roi_priority(detections: list, cx: int, cy: int,
 # ============================================================================
 
 def maybe_trigger_arm(system: SystemController, label, u, v, conf, 
-                     bbox_coords, frame, cooldown_s, angle_detector):
-    """Simplified trigger logic using SystemController."""
+                     bbox_coords, frame, cooldown_s, angle_detector,
+                     object_angle=None):
+    """Simplified trigger logic using SystemController.
+
+    object_angle: angle already measured for this bbox (e.g. by the display
+    overlay); when None it is computed here.
+    """
     if not system.can_trigger_pick(cooldown_s):
         return
     
     center_x = frame.shape[1] // 2
     center_y = frame.shape[0] // 2
     
-    if angle_detector:
-        x1, y1, x2, y2 = bbox_coords
-        object_angle = angle_detector.detect_angle(frame, x1, y1, x2, y2, label)
-    else:
-        object_angle = 0.0
+    if object_angle is None:
+        # Only bottles use the measured angle; everything else gets a fixed rotation
+        if angle_detector and _LABEL_INFO.get(label.lower(), _DEFAULT_LABEL_INFO)[1] == 'angle':
+            x1, y1, x2, y2 = bbox_coords
+            object_angle = angle_detector.detect_angle(frame, x1, y1, x2, y2, label)
+        else:
+            object_angle = 0.0
     
-    print(f"[TRIGGER] Initiating pick for {label}")
+    log.info("[TRIGGER] Initiating pick for %s", label)
     system.execute_pick_sequence(
         label, u, v, conf, object_angle,
         center_x, center_y, cooldown_s
@@ -727,6 +1137,12 @@ def parse():
     ap.add_argument('--width', type=int, default=1920)
     ap.add_argument('--height', type=int, default=1080)
     ap.add_argument('--fps', type=int, default=30)
+    ap.add_argument('--fourcc', type=str, default='MJPG',
+                    help='Camera pixel format. MJPG needs a CPU JPEG decode per frame; '
+                         'YUYV skips it where the camera supports it at the chosen size/fps')
+    ap.add_argument('--raw_capture', action='store_true',
+                    help='Disable the backend\'s colour conversion and decode/convert frames '
+                         'only when the display or the model asks for them')
     ap.add_argument('--conf', type=float, default=0.40)
     ap.add_argument('--classes', type=str, default='plastic_bottle,glass_bottle,paper cup,metal-can')
     ap.add_argument('--cooldown', type=float, default=2.0)
@@ -734,16 +1150,29 @@ def parse():
     ap.add_argument('--roi_x', type=float, default=0.15)
     ap.add_argument('--roi_y', type=float, default=0.15)
     ap.add_argument('--skip_frames', type=int, default=0)
-    ap.add_argument('--inference_size', type=int, default=640)
+    ap.add_argument('--inference_size', type=int, default=640,
+                    help='Width frames are downscaled to before inference (0 = full resolution)')
     ap.add_argument('--use_angle', action='store_true',
                     help='Enable angle-aware gripper rotation for bottles')
     ap.add_argument('--debug_angle', action='store_true',
                     help='Show angle detection debug windows')
     ap.add_argument('--show_angle', action='store_true',
                     help='Display detected angle on frame')
+    ap.add_argument('--opencl', action='store_true',
+                    help='Run the angle detector\'s image ops through OpenCL (T-API) if available')
+    ap.add_argument('--headless', action='store_true',
+                    help='Run without a display window (no drawing, stop with Ctrl+C/SIGTERM)')
+    ap.add_argument('--display_fps', type=float, default=10.0,
+                    help='Max rate the annotated preview is redrawn (0 = every frame)')
+    ap.add_argument('--log_level', type=str.upper, default='INFO',
+                    choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                    help='Runtime log level; DEBUG adds the per-pick sequence/step traces')
     ap.add_argument('--conveyor_ip', type=str, default=CONVEYOR_PLUG_IP,
                     help=f'IP address of Kasa smart plug (default: {CONVEYOR_PLUG_IP})')
-    return ap.parse_args()
+    args = ap.parse_args()
+    if len(args.fourcc) != 4:
+        ap.error(f"--fourcc must be 4 characters, got '{args.fourcc}'")
+    return args
 
 
 # ============================================================================
@@ -763,20 +1192,327 @@ def load_model(conf):
     return model
 
 
+# ============================================================================
+# THREADED CAPTURE
+# ============================================================================
+
+class FrameGrabber:
+    """
+    Reads frames from a cv2.VideoCapture on a background thread.
+    Only the most recent frame is kept (single slot, overwritten), so a slow
+    consumer never builds up a backlog of stale frames. Frames are numbered,
+    so several consumers (display loop, inference worker) can each wait for
+    one newer than the last they saw. Consumers must not modify a frame in
+    place, since other consumers may be reading it.
+    
+    With raw=True the capture delivers undecoded frames (CONVERT_RGB off), and
+    the JPEG decode / YUYV conversion is done on first request (to_bgr/bgr),
+    so frames nobody asks for are never converted.
+    """
+    
+    def __init__(self, cap, raw: bool = False):
+        self.cap = cap
+        self.raw = raw
+        self.latest = None
+        self._bgr = None
+        self._bgr_seq = 0
+        self._size = None
+        self._read_frame = None
+        self.stop_event = threading.Event()
+        self._seq = 0
+        self._read_seq = 0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            ok, frame = self.cap.read()
+            with self._cond:
+                if ok:
+                    self.latest = frame
+                    self._seq += 1
+                else:
+                    self.stop_event.set()
+                self._cond.notify_all()
+    
+    def wait_newer(self, seq: int, timeout: float = GRAB_TIMEOUT_S):
+        """
+        Wait for a frame numbered above `seq`. Returns (frame_seq, frame), with
+        frame None on timeout or after the camera stopped; frame_seq is then
+        the newest frame number, which may be below `seq`. In raw mode the
+        frame is undecoded; pass it to to_bgr() to get an image.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._seq > seq or self.stop_event.is_set(), timeout)
+            if self._seq <= seq:
+                return self._seq, None
+            return self._seq, self.latest
+    
+    def to_bgr(self, seq: int, frame):
+        """
+        BGR image of frame number `seq` as returned by wait_newer/read.
+        Conversion runs outside the lock and the newest result is shared, so
+        the display loop and the inference worker never convert a frame twice.
+        Returns None if the frame cannot be decoded.
+        """
+        if not self.raw:
+            return frame
+        with self._cond:
+            if self._bgr_seq == seq:
+                return self._bgr
+        
+        bgr = self._to_bgr(frame)
+        if bgr is not None:
+            with self._cond:
+                if seq > self._bgr_seq:
+                    self._bgr, self._bgr_seq = bgr, seq
+                self._size = bgr.shape[:2]
+        return bgr
+    
+    @staticmethod
+    def _to_bgr(raw):
+        """BGR image from a frame read with CAP_PROP_CONVERT_RGB off."""
+        if raw.ndim == 3 and raw.shape[2] == 2:
+            return cv2.cvtColor(raw, cv2.COLOR_YUV2BGR_YUYV)
+        if raw.ndim == 1 or raw.shape[0] == 1:
+            # MJPG: the undecoded JPEG bitstream
+            return cv2.imdecode(raw.reshape(-1), cv2.IMREAD_COLOR)
+        return raw
+    
+    def read(self, timeout: float = GRAB_TIMEOUT_S):
+        """
+        Wait for a frame newer than the last one returned. Returns (ok, frame);
+        in raw mode the frame is undecoded, use bgr() for the image.
+        """
+        seq, frame = self.wait_newer(self._read_seq, timeout)
+        if frame is None:
+            return False, None
+        self._read_seq, self._read_frame = seq, frame
+        return True, frame
+    
+    def bgr(self):
+        """BGR image of the frame last returned by read() (None if undecodable)."""
+        return self.to_bgr(self._read_seq, self._read_frame)
+    
+    def size(self):
+        """
+        (height, width) of the frame last returned by read(). Raw JPEG frames
+        don't carry it, so the size of the last decoded frame is used, and
+        this frame is decoded only if nothing has been decoded yet.
+        """
+        frame = self._read_frame
+        if not self.raw or (frame.ndim == 3 and frame.shape[2] == 2):
+            return frame.shape[:2]
+        if self._size is None and self.bgr() is None:
+            return None
+        return self._size
+    
+    def stop(self):
+        self.stop_event.set()
+        self._thread.join(timeout=1.0)
+
+
+# ============================================================================
+# ASYNC INFERENCE
+# ============================================================================
+
+# (xyxy int32[N, 4], conf float32[N], labels list[str]) with no detections
+EMPTY_DETECTIONS = (np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32), [])
+
+
+def parse_predictions(predictions, scale_x: float = 1.0, scale_y: float = 1.0) -> tuple:
+    """
+    Convert Roboflow predictions to (xyxy, conf, labels) arrays.
+    scale_x/scale_y map coordinates from the inference image back to the frame.
+    """
+    n = len(predictions)
+    if n == 0:
+        return EMPTY_DETECTIONS
+    
+    arr = np.array(
+        [(p.x, p.y, p.width, p.height, p.confidence) for p in predictions],
+        dtype=np.float64
+    )
+    if scale_x != 1.0 or scale_y != 1.0:
+        arr[:, 0:4] *= (scale_x, scale_y, scale_x, scale_y)
+    half = arr[:, 2:4] * 0.5
+    xyxy = np.empty((n, 4), dtype=np.float64)
+    xyxy[:, :2] = arr[:, :2] - half
+    xyxy[:, 2:] = arr[:, :2] + half
+    
+    return (xyxy.astype(np.int32), arr[:, 4].astype(np.float32),
+            [p.class_name for p in predictions])
+
+
+class InferenceWorker:
+    """
+    Runs model inference on a background thread.
+    Frames are pulled straight from the FrameGrabber, so a new inference
+    starts as soon as the previous one finishes, independent of how long the
+    main loop spends drawing. Frames that arrive while an inference is in
+    flight are dropped, and the main loop keeps drawing the most recent
+    detections. Predictions are parsed here, so the main loop only ever sees
+    plain arrays.
+    """
+    
+    def __init__(self, model, conf: float, grabber: FrameGrabber,
+                 inference_size: int = 0, skip_frames: int = 0):
+        self.model = model
+        self.conf = conf
+        self.grabber = grabber
+        # Width frames are downscaled to before inference (0 = full frame)
+        self.inference_size = inference_size
+        # Camera frames to skip after each one that is sent to the model
+        self.skip_frames = skip_frames
+        # Reused model input; only one inference is ever in flight
+        self._small_buf = None
+        self._lock = Lock()
+        self._det = EMPTY_DETECTIONS
+        self._infer_ms = 0.0
+        self._version = 0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def _prepare(self, frame):
+        """
+        Return (image, scale_x, scale_y) with the image at most inference_size
+        wide. Frames are never upscaled.
+        """
+        h, w = frame.shape[:2]
+        if self.inference_size <= 0 or w <= self.inference_size:
+            return frame, 1.0, 1.0
+        size = (self.inference_size, max(1, self.inference_size * h // w))
+        shape = (size[1], size[0]) + frame.shape[2:]
+        if self._small_buf is None or self._small_buf.shape != shape:
+            self._small_buf = np.empty(shape, dtype=frame.dtype)
+        # INTER_AREA averages the source pixels, so fine detail doesn't alias
+        # at 3x decimation; the cost lands on this thread, not the display loop
+        small = cv2.resize(frame, size, dst=self._small_buf, interpolation=cv2.INTER_AREA)
+        return small, w / size[0], h / size[1]
+    
+    def latest(self):
+        """
+        Return ((xyxy, conf, labels), infer_ms, version) from the most recent
+        inference. `version` increases with every published result.
+        """
+        with self._lock:
+            return self._det, self._infer_ms, self._version
+    
+    def _run(self):
+        seq = 0
+        while not self._stop_event.is_set():
+            # --skip_frames is a coarse throttle on top of the natural drop;
+            # seq only moves to frames actually received, not the threshold
+            new_seq, frame = self.grabber.wait_newer(seq + self.skip_frames, timeout=0.1)
+            if frame is None:
+                if self.grabber.stop_event.is_set():
+                    break
+                continue
+            seq = new_seq
+            frame = self.grabber.to_bgr(seq, frame)
+            if frame is None:
+                continue
+            frame, scale_x, scale_y = self._prepare(frame)
+            
+            t0 = time.perf_counter()
+            try:
+                rf_result = self.model.infer(frame, confidence=self.conf)[0]
+                infer_ms = (time.perf_counter() - t0) * 1000.0
+                det = parse_predictions(rf_result.predictions, scale_x, scale_y)
+            except Exception as e:
+                log.warning("[WARN] Inference failed: %s", e)
+                # Don't leave the last good detections standing in for a
+                # model that has stopped answering
+                with self._lock:
+                    self._det = EMPTY_DETECTIONS
+                    self._version += 1
+                continue
+            
+            with self._lock:
+                self._det = det
+                self._infer_ms = infer_ms
+                self._version += 1
+    
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join(timeout=1.0)
+
+
+# ============================================================================
+# DISPLAY HELPERS
+# ============================================================================
+
+# cos/sin of every whole degree in [-180, 180]; the orientation line is only
+# a 50 px indicator, so degree resolution is plenty
+_COS_LUT = np.cos(np.deg2rad(np.arange(-180, 181))).astype(np.float32)
+_SIN_LUT = np.sin(np.deg2rad(np.arange(-180, 181))).astype(np.float32)
+
+
+@njit(cache=True)
+def _orientation_offset(angle_deg, length):
+    """End-point offset (dx, dy) of the orientation line for an angle."""
+    i = int(round(angle_deg)) + 180
+    return int(length * _COS_LUT[i]), int(length * _SIN_LUT[i])
+
+
+if NUMBA_AVAILABLE:
+    _orientation_offset(0.0, 50)
+
+
+# Rendered HUD strings keyed on (text, scale, color, thickness)
+_TEXT_CACHE = {}
+
+
+def cached_text(img, text, org, scale, color, thickness=2):
+    """
+    Draw text like cv2.putText, but rasterize each distinct string once and
+    stamp it with a masked copy afterwards. Meant for HUD strings that repeat
+    from frame to frame; glyph edges are not anti-aliased.
+    """
+    key = (text, scale, color, thickness)
+    entry = _TEXT_CACHE.get(key)
+    if entry is None:
+        (tw, th), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        pad = thickness
+        coverage = np.zeros((th + baseline + 2 * pad, tw + 2 * pad), dtype=np.uint8)
+        cv2.putText(coverage, text, (pad, pad + th),
+                    cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+        layer = np.empty(coverage.shape + (3,), dtype=np.uint8)
+        layer[:] = color
+        if len(_TEXT_CACHE) >= TEXT_CACHE_MAX:
+            _TEXT_CACHE.clear()
+        entry = _TEXT_CACHE[key] = (layer, (coverage >= 128).astype(np.uint8), pad, pad + th)
+    
+    layer, mask, pad, ascent = entry
+    x0, y0 = org[0] - pad, org[1] - ascent
+    h, w = mask.shape
+    img_h, img_w = img.shape[:2]
+    # Clip the stamp to the frame
+    sx0, sy0 = max(0, -x0), max(0, -y0)
+    sx1, sy1 = min(w, img_w - x0), min(h, img_h - y0)
+    if sx1 <= sx0 or sy1 <= sy0:
+        return
+    cv2.copyTo(layer[sy0:sy1, sx0:sx1], mask[sy0:sy1, sx0:sx1],
+               img[y0 + sy0:y0 + sy1, x0 + sx0:x0 + sx1])
+
 # ============================================================================
 # MAIN LOOP
 # ============================================================================
 
 def main():
     args = parse()
+    setup_logging(getattr(logging, args.log_level))
     
     print(f"\n[INFO] ===== OBJECT CATEGORIZATION =====")
-    print(f"[INFO] RECYCLABLE (→ LEFT box): {RECYCLABLE_ITEMS}")
-    print(f"[INFO] NON-RECYCLABLE (→ RIGHT box): {NON_RECYCLABLE_ITEMS}")
+    print(f"[INFO] RECYCLABLE (→ LEFT box): {sorted(RECYCLABLE_ITEMS)}")
+    print(f"[INFO] NON-RECYCLABLE (→ RIGHT box): {sorted(NON_RECYCLABLE_ITEMS)}")
     print(f"[INFO] ===================================")
     print(f"\n[INFO] ===== ROTATION STRATEGY =====")
-    print(f"[INFO] ANGLE-BASED (bottles): {ANGLE_DETECTION_OBJECTS}")
-    print(f"[INFO] FIXED ROTATION ({GRIP_ROT_FIXED}): {FIXED_ROTATION_OBJECTS}")
+    print(f"[INFO] ANGLE-BASED (bottles): {sorted(ANGLE_DETECTION_OBJECTS)}")
+    print(f"[INFO] FIXED ROTATION ({GRIP_ROT_FIXED}): {sorted(FIXED_ROTATION_OBJECTS)}")
     print(f"[INFO] ===================================")
     print(f"\n[INFO] ===== POSITION FINE-TUNING =====")
     if ENABLE_FINE_TUNING:
@@ -791,6 +1527,14 @@ def main():
     print(f"\n[INFO] ===== DETECTION STRATEGY =====")
     print(f"[INFO] ROI-Priority Selection: ENABLED")
     print(f"[INFO] ===================================")
+    print(f"\n[INFO] ===== OPENCV =====")
+    # Half the cores: leaves room for the capture, inference and conveyor threads
+    cv_threads = max(1, (os.cpu_count() or 2) // 2)
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(cv_threads)
+    print(f"[INFO] Optimized code paths: {cv2.useOptimized()}")
+    print(f"[INFO] Worker threads: {cv2.getNumThreads()}")
+    print(f"[INFO] ===================================")
     print(f"\n[INFO] ===== STATE MACHINE =====")
     print(f"[INFO] IDLE: Normal detection, conveyor running")
     print(f"[INFO] PICKING: Arm executing, conveyor stopped")
@@ -799,12 +1543,18 @@ def main():
     
     angle_detector = None
     if args.use_angle:
-        angle_detector = ObjectAngleDetector(debug=args.debug_angle)
+        angle_detector = ObjectAngleDetector(debug=args.debug_angle and not args.headless,
+                                             use_opencl=args.opencl)
         print(f"[INFO] ✓ Angle detection ENABLED (for bottles only)")
         print(f"[INFO] Gripper rotation servo: ID{GRIP_ROT_SERVO_ID}")
         print(f"[INFO] Rotation range: {GRIP_ROT_MIN} to {GRIP_ROT_MAX} (neutral: {GRIP_ROT_NEUTRAL})")
         print(f"[INFO] Fixed rotation for non-bottles: {GRIP_ROT_FIXED}")
         print(f"[INFO] Angle threshold: [{ANGLE_ADJUST_MIN}°, {ANGLE_ADJUST_MAX}°]")
+        if args.opencl:
+            if angle_detector.use_opencl:
+                print(f"[INFO] Angle detector using OpenCL: {cv2.ocl.Device.getDefault().name()}")
+            else:
+                print("[WARN] OpenCL not available, angle detector stays on the CPU")
     else:
         print(f"[INFO] Using FIXED sequences")
         print(f"[INFO] Non-bottles use fixed rotation: {GRIP_ROT_FIXED}")
@@ -836,9 +1586,10 @@ def main():
     system = SystemController(conveyor, arm)
     print("[INFO] ✓ System controller initialized")
     
-    cv2.destroyAllWindows()
     WIN_NAME = f"YOLOv5_DualBox_{os.getpid()}"
-    cv2.namedWindow(WIN_NAME, cv2.WINDOW_NORMAL)
+    if not args.headless:
+        cv2.destroyAllWindows()
+        cv2.namedWindow(WIN_NAME, cv2.WINDOW_NORMAL)
     
     ROI_MARGIN_X = float(max(0.0, min(1.0, args.roi_x)))
     ROI_MARGIN_Y = float(max(0.0, min(1.0, args.roi_y)))
@@ -852,196 +1603,243 @@ def main():
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, args.width)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, args.height)
     cap.set(cv2.CAP_PROP_FPS, args.fps)
-    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*args.fourcc))
     cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
     
     if not cap.isOpened():
         raise RuntimeError('Could not open camera.')
     
-    t_prev = time.time()
+    raw_capture = args.raw_capture and cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+    if args.raw_capture and not raw_capture:
+        print("[WARN] Capture backend ignores CONVERT_RGB, using converted frames")
+    
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc_str = ("".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4))
+                  if fourcc else "unknown")
+    print(f"[INFO] Capture format: {fourcc_str} (requested {args.fourcc})"
+          f"{', raw frames' if raw_capture else ''}")
+    
+    grabber = FrameGrabber(cap, raw=raw_capture)
+    infer_worker = InferenceWorker(model, args.conf, grabber,
+                                   args.inference_size, args.skip_frames)
+    
+    t_prev = time.monotonic()
+    hud_frames = 0
+    hud_text = ""
     stable_count = 0
+    stable_version = 0
     last_label = None
     last_bbox = None
-    frame_counter = 0
-    last_det = []
     last_angle = 0.0
+    last_angle_bbox = None
+    static_hud = []
+    det_key = None
+    det_overlay_key = None
+    det_overlay = []
+    best_hit = None
+    static_hud_size = None
+    frame_size = None
+    display_interval = 1.0 / args.display_fps if args.display_fps > 0 else 0.0
+    last_draw = float("-inf")
+    
+    if args.headless:
+        print("[INFO] Starting detection loop (headless). Press Ctrl+C to quit.")
+    else:
+        print("[INFO] Starting detection loop. Press 'q' or ESC to quit.")
     
-    print("[INFO] Starting detection loop. Press 'q' or ESC to quit.")
+    # SIGTERM (service stop, `kill`) ends the loop like 'q' does, so the
+    # cleanup below still parks the arm and stops the conveyor
+    stop_requested = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, _frame: stop_requested.set())
     
     try:
-        while True:
-            ok, frame = cap.read()
+        while not stop_requested.is_set():
+            ok, _ = grabber.read()
             if not ok:
-                break
+                # A timeout is just a slow camera; only a failed read ends the loop
+                if grabber.stop_event.is_set():
+                    break
+                log.warning("[WARN] No camera frame in %.0f s, still waiting", GRAB_TIMEOUT_S)
+                continue
+            # Frame geometry only changes if the camera renegotiates its size
+            size = grabber.size()
+            if size is None:
+                continue
+            if size != frame_size:
+                frame_size = size
+                H, W = frame_size
+                cx, cy = W // 2, H // 2
+                rx = int(W * ROI_MARGIN_X / 2.0)
+                ry = int(H * ROI_MARGIN_Y / 2.0)
             
-            H, W = frame.shape[:2]
-            cx, cy = W // 2, H // 2
-            rx = int(W * ROI_MARGIN_X / 2.0)
-            ry = int(H * ROI_MARGIN_Y / 2.0)
+            det, infer_ms, det_version = infer_worker.latest()
             
-            frame_counter += 1
-            should_detect = (frame_counter % (args.skip_frames + 1) == 0)
+            # Between inferences the detections are unchanged, so the best hit
+            # and the per-box overlay are only rebuilt for a new result
+            if (det_version, W, H) != det_key:
+                det_key = (det_version, W, H)
+                # One ROI test per result, used by the selection and the overlay
+                det_in_roi = roi_mask(det[0], cx, cy, rx, ry)
+                best_hit = select_best_hit_with_roi_priority(det, det_in_roi)
+                # Angles measured for the previous result may belong to a
+                # different object that happened to have the same bbox
+                last_angle_bbox = None
+                if angle_detector:
+                    angle_detector.reset_cache()
             
-            if should_detect:
-                t0 = time.time()
-                rf_result = model.infer(frame, confidence=args.conf)[0]
-                infer_ms = (time.time() - t0) * 1000.0
-                
-                det = []
-                for p in rf_result.predictions:
-                    x1 = int(p.x - p.width / 2)
-                    y1 = int(p.y - p.height / 2)
-                    x2 = int(p.x + p.width / 2)
-                    y2 = int(p.y + p.height / 2)
-                    det.append((x1, y1, x2, y2, float(p.confidence), p.class_name))
-                
-                last_det = det
-            else:
-                det = last_det
-                infer_ms = 0.0
+            # FPS is averaged over HUD_REFRESH_S so the readout string stays
+            # the same between updates and its cached stamp can be reused
+            now = time.monotonic()
+            hud_frames += 1
+            if now - t_prev >= HUD_REFRESH_S:
+                hud_text = f"{hud_frames / (now - t_prev):4.1f} FPS | {infer_ms:5.1f} ms"
+                hud_frames = 0
+                t_prev = now
             
-            best_hit = select_best_hit_with_roi_priority(det, cx, cy, rx, ry)
+            # Overlay work is only done for frames that will be shown
+            draw = not args.headless and now - last_draw >= display_interval
+            if draw:
+                # Only frames that are shown or trigger a pick are decoded
+                # (--raw_capture); angles are measured on this camera image,
+                # never on the overlay
+                cam_frame = grabber.bgr()
+                draw = cam_frame is not None
+            if draw:
+                last_draw = now
+                # The grabbed frame is shared with the inference worker, so
+                # the overlay goes on a private copy
+                frame = cam_frame.copy()
             
-            for x1, y1, x2, y2, conf, label in det:
-                category = get_sequence_type_for_label(label)
-                label_lower = label.lower()
-                
-                u = (x1 + x2) // 2
-                v = (y1 + y2) // 2
-                in_roi = is_in_roi(u, v, cx, cy, rx, ry)
-                
-                is_best_hit = (best_hit is not None and 
-                              best_hit["u"] == u and 
-                              best_hit["v"] == v and 
-                              best_hit["label"] == label)
-                
-                thickness = 3 if is_best_hit else 2
-                
-                if category == 'left':
-                    box_color = (0, 255, 0)
-                    label_suffix = " [R]"
-                else:
-                    box_color = (0, 165, 255)
-                    label_suffix = " [N]"
-                
-                if label_lower in FIXED_ROTATION_OBJECTS:
-                    label_suffix += f" FIX:{GRIP_ROT_FIXED}"
-                elif label_lower in ANGLE_DETECTION_OBJECTS:
-                    label_suffix += " ANG"
-                
-                if in_roi:
-                    label_suffix += " ✓ROI"
+            if draw and det_overlay_key != det_key:
+                det_overlay_key = det_key
+                det_overlay = []
+                det_xyxy, det_conf, det_labels = det
+                best_idx = best_hit["index"] if best_hit is not None else -1
+                for i, (label, (x1, y1, x2, y2), conf, in_roi) in enumerate(
+                        zip(det_labels, det_xyxy.tolist(), det_conf.tolist(), det_in_roi.tolist())):
+                    category, _, label_suffix = _LABEL_INFO.get(label.lower(), _DEFAULT_LABEL_INFO)
+                    is_best_hit = i == best_idx
+                    
+                    thickness = 3 if is_best_hit else 2
+                    
+                    box_color = (0, 255, 0) if category == 'left' else (0, 165, 255)
+                    
+                    if in_roi:
+                        label_suffix += " ✓ROI"
+                    
+                    if is_best_hit:
+                        label_suffix += " ★BEST"
+                    
+                    det_overlay.append(((x1, y1), (x2, y2), box_color, thickness,
+                                        f"{label}{label_suffix} {conf:.2f}",
+                                        (x1, max(20, y1 - 6))))
+            
+            if draw:
+                for pt1, pt2, box_color, thickness, text, org in det_overlay:
+                    cv2.rectangle(frame, pt1, pt2, box_color, thickness)
+                    cached_text(frame, text, org, 0.6, box_color)
                 
-                if is_best_hit:
-                    label_suffix += " ★BEST"
+                cv2.rectangle(frame, (cx - rx, cy - ry), (cx + rx, cy + ry), (255, 255, 0), 2)
+                cached_text(frame, "CENTER ROI", (cx - rx, cy - ry - 8), 0.6, (255, 255, 0))
                 
-                cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, thickness)
-                cv2.putText(frame, f"{label}{label_suffix} {conf:.2f}",
-                            (x1, max(20, y1 - 6)),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, box_color, 2)
-            
-            cv2.rectangle(frame, (cx - rx, cy - ry), (cx + rx, cy + ry), (255, 255, 0), 2)
-            cv2.putText(frame, "CENTER ROI", (cx - rx, cy - ry - 8),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-            
-            cv2.line(frame, (cx - 10, cy), (cx + 10, cy), (255, 255, 0), 1)
-            cv2.line(frame, (cx, cy - 10), (cx, cy + 10), (255, 255, 0), 1)
+                cv2.line(frame, (cx - 10, cy), (cx + 10, cy), (255, 255, 0), 1)
+                cv2.line(frame, (cx, cy - 10), (cx, cy + 10), (255, 255, 0), 1)
             
             in_roi = False
             if best_hit is not None and best_hit["conf"] >= MIN_CONF:
                 u, v = best_hit["u"], best_hit["v"]
                 in_roi = best_hit["in_roi"]
                 
-                cv2.circle(frame, (u, v), 7, (255, 0, 255), -1)
-                cv2.circle(frame, (u, v), 5, (0, 255, 0), -1)
-                
-                if ENABLE_FINE_TUNING:
-                    cv2.line(frame, (cx, cy), (u, v), (255, 0, 255), 2)
-                    offset_x = u - cx
-                    offset_y = v - cy
-                    cv2.putText(frame, f"Offset: ({offset_x:+d}, {offset_y:+d})",
-                               (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 
-                               0.7, (255, 0, 255), 2)
+                if draw:
+                    cv2.circle(frame, (u, v), 7, (255, 0, 255), -1)
+                    cv2.circle(frame, (u, v), 5, (0, 255, 0), -1)
+                    
+                    if ENABLE_FINE_TUNING:
+                        cv2.line(frame, (cx, cy), (u, v), (255, 0, 255), 2)
+                        offset_x = u - cx
+                        offset_y = v - cy
+                        cv2.putText(frame, f"Offset: ({offset_x:+d}, {offset_y:+d})",
+                                   (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 
+                                   0.7, (255, 0, 255), 2)
                 
-                if args.show_angle and angle_detector:
+                if draw and args.show_angle and angle_detector:
                     x1, y1, x2, y2 = best_hit["bbox"]
-                    detected_angle = angle_detector.detect_angle(frame, x1, y1, x2, y2, best_hit["label"])
+                    detected_angle = angle_detector.detect_angle(cam_frame, x1, y1, x2, y2, best_hit["label"])
                     last_angle = detected_angle
+                    last_angle_bbox = best_hit["bbox"]
                     
                     cv2.putText(frame, f"Angle: {detected_angle:.1f}deg",
                                (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 
                                0.8, (0, 255, 255), 2)
                     
-                    length = 50
-                    angle_rad = math.radians(detected_angle)
-                    dx = int(length * math.cos(angle_rad))
-                    dy = int(length * math.sin(angle_rad))
+                    dx, dy = _orientation_offset(float(detected_angle), 50)
                     cv2.line(frame, (u, v), (u + dx, v - dy), (0, 255, 255), 2)
             
             current_state = system.get_state()
             if current_state == SystemState.IDLE:
-                if in_roi and best_hit is not None:
-                    if last_label == best_hit["label"]:
-                        stable_count += 1
-                        last_bbox = best_hit["bbox"]
+                # Stability counts inference results, not camera frames: the
+                # same detections are reused until the worker publishes anew
+                if det_version != stable_version:
+                    stable_version = det_version
+                    if in_roi and best_hit is not None:
+                        if last_label == best_hit["label"]:
+                            stable_count += 1
+                            last_bbox = best_hit["bbox"]
+                        else:
+                            last_label = best_hit["label"]
+                            last_bbox = best_hit["bbox"]
+                            stable_count = 1
                     else:
-                        last_label = best_hit["label"]
-                        last_bbox = best_hit["bbox"]
-                        stable_count = 1
-                else:
-                    stable_count = 0
-                    last_label = None
-                    last_bbox = None
+                        stable_count = 0
+                        last_label = None
+                        last_bbox = None
             else:
                 stable_count = 0
                 last_label = None
                 last_bbox = None
             
-            now = time.time()
-            fps = 1.0 / max(1e-6, now - t_prev)
-            t_prev = now
-            
-            cv2.putText(frame, f"{fps:4.1f} FPS | {infer_ms:5.1f} ms", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (50, 200, 50), 2)
-            cv2.putText(frame, f"Stable: {stable_count}/{STABLE_N}", 
-                       (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (50, 200, 50), 2)
-            cv2.putText(frame, f"Mode: ROI-PRIORITY", 
-                       (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 165, 0), 2)
-            
-            if args.use_angle:
-                cv2.putText(frame, "ANGLE: Bottles only", (W - 250, 30),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-            
-            if conveyor and conveyor.is_initialized:
-                conv_state = conveyor.get_state()
-                if conv_state is not None:
-                    status_text = "CONVEYOR: ON" if conv_state else "CONVEYOR: OFF"
-                    status_color = (0, 255, 0) if conv_state else (0, 0, 255)
-                    cv2.putText(frame, status_text, (W - 220, 60),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)
-            
-            if ENABLE_FINE_TUNING:
-                cv2.putText(frame, "FINE-TUNE: ON", (W - 220, 90),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 255), 2)
-            
-            state = system.get_state()
-            state_colors = {
-                SystemState.IDLE: (0, 255, 0),
-                SystemState.PICKING: (0, 0, 255),
-                SystemState.COOLDOWN: (0, 165, 255)
-            }
-            cv2.putText(frame, f"STATE: {state.name}", 
-                       (W - 250, 120),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, 
-                       state_colors.get(state, (255, 255, 255)), 2)
-            
-            cv2.putText(frame, "Green[R] = Recyclable | Orange[N] = Non-Recyclable", 
-                       (10, H - 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            cv2.putText(frame, f"✓ROI = In ROI | ★BEST = Selected Target", 
-                       (10, H - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            if draw:
+                if hud_text:
+                    cached_text(frame, hud_text, (10, 30), 0.8, (50, 200, 50))
+                cached_text(frame, f"Stable: {stable_count}/{STABLE_N}",
+                            (10, 60), 0.8, (50, 200, 50))
+                
+                # Text that only depends on the frame size and CLI flags
+                if static_hud_size != (W, H):
+                    static_hud = [
+                        ("Mode: ROI-PRIORITY", (10, 90), 0.8, (255, 165, 0)),
+                        ("Green[R] = Recyclable | Orange[N] = Non-Recyclable",
+                         (10, H - 60), 0.6, (255, 255, 255)),
+                        ("✓ROI = In ROI | ★BEST = Selected Target",
+                         (10, H - 30), 0.6, (255, 255, 255)),
+                    ]
+                    if args.use_angle:
+                        static_hud.append(("ANGLE: Bottles only", (W - 250, 30), 0.7, (0, 255, 255)))
+                    if ENABLE_FINE_TUNING:
+                        static_hud.append(("FINE-TUNE: ON", (W - 220, 90), 0.7, (255, 0, 255)))
+                    static_hud_size = (W, H)
+                for text, org, scale, color in static_hud:
+                    cached_text(frame, text, org, scale, color)
+                
+                if conveyor and conveyor.is_initialized:
+                    conv_state = conveyor.get_state()
+                    if conv_state is not None:
+                        status_text = "CONVEYOR: ON" if conv_state else "CONVEYOR: OFF"
+                        status_color = (0, 255, 0) if conv_state else (0, 0, 255)
+                        cached_text(frame, status_text, (W - 220, 60), 0.7, status_color)
+                
+                state = system.get_state()
+                state_colors = {
+                    SystemState.IDLE: (0, 255, 0),
+                    SystemState.PICKING: (0, 0, 255),
+                    SystemState.COOLDOWN: (0, 165, 255)
+                }
+                cached_text(frame, f"STATE: {state.name}", (W - 250, 120), 0.7,
+                            state_colors.get(state, (255, 255, 255)))
             
             if best_hit is not None and in_roi and stable_count >= STABLE_N:
-                if current_state == SystemState.IDLE:
+                trigger_frame = grabber.bgr() if current_state == SystemState.IDLE else None
+                if trigger_frame is not None:
                     maybe_trigger_arm(
                         system,
                         best_hit["label"],
@@ -1049,28 +1847,35 @@ def main():
                         best_hit["v"],
                         best_hit["conf"],
                         best_hit["bbox"],
-                        frame,
+                        trigger_frame,
                         args.cooldown,
-                        angle_detector
+                        angle_detector,
+                        last_angle if last_angle_bbox == best_hit["bbox"] else None
                     )
                 
                 stable_count = 0
                 last_label = None
                 last_bbox = None
             
-            cv2.imshow(WIN_NAME, frame)
-            k = cv2.waitKey(1) & 0xFF
-            if k in (27, ord('q')):
-                break
+            if draw:
+                cv2.imshow(WIN_NAME, frame)
+                k = cv2.waitKey(1) & 0xFF
+                if k in (27, ord('q')):
+                    break
     
     except KeyboardInterrupt:
         print("\n[INFO] Interrupted by user")
     
     finally:
         print("[INFO] Cleaning up...")
+        grabber.stop()
+        infer_worker.stop()
         system.emergency_stop()
+        if conveyor:
+            conveyor.close()
         cap.release()
-        cv2.destroyAllWindows()
+        if not args.headless:
+            cv2.destroyAllWindows()
         print("[INFO] Done!")
 
 
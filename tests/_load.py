@@ -0,0 +1,19 @@
+"""Import detect5_new for tests without the Roboflow runtime installed."""
+import importlib
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+try:
+    import inference  # noqa: F401
+except ImportError:
+    # Only get_model is imported at module level and the tests never call it
+    _stub = types.ModuleType("inference")
+    _stub.get_model = None
+    sys.modules["inference"] = _stub
+
+detect = importlib.import_module("detect5_new")
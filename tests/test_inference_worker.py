@@ -0,0 +1,81 @@
+import threading
+import time
+import types
+import unittest
+
+import numpy as np
+
+from _load import detect
+
+
+class SlowCamera:
+    """cv2.VideoCapture stand-in: `n` numbered frames, one every `interval` s."""
+
+    def __init__(self, n, interval):
+        self.n = n
+        self.interval = interval
+        self.count = 0
+
+    def read(self):
+        time.sleep(self.interval)
+        if self.count >= self.n:
+            return False, None
+        self.count += 1
+        return True, np.full((4, 4, 3), self.count, dtype=np.uint8)
+
+
+class RecordingModel:
+    """Records the number of every frame it is asked to run on."""
+
+    def __init__(self):
+        self.seen = []
+        self.lock = threading.Lock()
+
+    def infer(self, frame, confidence):
+        with self.lock:
+            self.seen.append(int(frame[0, 0, 0]))
+        return [types.SimpleNamespace(predictions=[])]
+
+
+class InferenceWorkerTest(unittest.TestCase):
+
+    def _run_worker(self, n, interval, skip_frames):
+        grabber = detect.FrameGrabber(SlowCamera(n, interval))
+        model = RecordingModel()
+        worker = detect.InferenceWorker(model, 0.5, grabber, skip_frames=skip_frames)
+        try:
+            deadline = time.monotonic() + n * interval + 1.0
+            while not grabber.stop_event.is_set() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            worker._thread.join(timeout=1.0)
+        finally:
+            worker.stop()
+            grabber.stop()
+        return model.seen
+
+    def test_skip_frames_with_camera_slower_than_wait_timeout(self):
+        # Frames every 0.15 s, so every wait for the next one times out at
+        # least once; the worker must keep up instead of outrunning the camera
+        seen = self._run_worker(n=10, interval=0.15, skip_frames=2)
+        self.assertGreaterEqual(len(seen), 2)
+        self.assertTrue(all(b - a >= 3 for a, b in zip(seen, seen[1:])), seen)
+
+    def test_large_skip_frames(self):
+        seen = self._run_worker(n=24, interval=0.04, skip_frames=5)
+        self.assertGreaterEqual(len(seen), 2)
+        self.assertTrue(all(b - a >= 6 for a, b in zip(seen, seen[1:])), seen)
+
+    def test_wait_newer_timeout_reports_latest_frame(self):
+        grabber = detect.FrameGrabber(SlowCamera(1, 0.01))
+        try:
+            seq, frame = grabber.wait_newer(0, timeout=1.0)
+            self.assertEqual(seq, 1)
+            seq, frame = grabber.wait_newer(5, timeout=0.05)
+            self.assertIsNone(frame)
+            self.assertEqual(seq, 1)
+        finally:
+            grabber.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
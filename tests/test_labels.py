@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+from _load import detect
+
+
+def _gripper_position(sequence):
+    step = sequence[detect.ROTATION_AFFECTED_STEPS[0]]
+    return dict(step)[detect.GRIP_ROT_SERVO_ID]
+
+
+class LabelInfoTest(unittest.TestCase):
+
+    def test_every_configured_label_has_an_entry(self):
+        labels = (detect.RECYCLABLE_ITEMS | detect.NON_RECYCLABLE_ITEMS
+                  | detect.ANGLE_DETECTION_OBJECTS | detect.FIXED_ROTATION_OBJECTS)
+        self.assertEqual(set(detect._LABEL_INFO), set(labels))
+
+    def test_sequence_type_matches_categories(self):
+        for label in detect.RECYCLABLE_ITEMS:
+            self.assertEqual(detect.get_sequence_type_for_label(label), 'left')
+        for label in detect.NON_RECYCLABLE_ITEMS:
+            self.assertEqual(detect.get_sequence_type_for_label(label), 'right')
+
+    def test_angle_only_label(self):
+        angle_set = detect.ANGLE_DETECTION_OBJECTS | {'water_bottle'}
+        with mock.patch.object(detect, 'ANGLE_DETECTION_OBJECTS', angle_set):
+            info = detect._describe_label('water_bottle')
+        self.assertEqual(info, ('left', 'angle', " [R] ANG"))
+
+        with mock.patch.dict(detect._LABEL_INFO, {'water_bottle': info}):
+            seq = detect.build_pick_sequence('water_bottle', 20.0, 'left',
+                                             320, 240, 320, 240)
+        self.assertEqual(_gripper_position(seq), detect.angle_to_servo(20.0))
+        self.assertNotEqual(_gripper_position(seq), detect.GRIP_ROT_NEUTRAL)
+
+    def test_fixed_only_label(self):
+        fixed_set = detect.FIXED_ROTATION_OBJECTS | {'egg_carton'}
+        with mock.patch.object(detect, 'FIXED_ROTATION_OBJECTS', fixed_set):
+            info = detect._describe_label('egg_carton')
+        self.assertEqual(info[:2], ('left', 'fixed'))
+
+        with mock.patch.dict(detect._LABEL_INFO, {'egg_carton': info}):
+            seq = detect.build_pick_sequence('egg_carton', 0.0, 'left',
+                                             320, 240, 320, 240)
+        self.assertEqual(_gripper_position(seq), detect.GRIP_ROT_FIXED)
+
+    def test_unknown_label_defaults_to_left(self):
+        with self.assertLogs(detect.log, 'WARNING'):
+            self.assertEqual(detect.get_sequence_type_for_label('banana'), 'left')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+from _load import detect
+
+
+def _detections(boxes, confs):
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    confs = np.asarray(confs, dtype=np.float32)
+    return boxes, confs, [f"obj{i}" for i in range(len(confs))]
+
+
+class RoiSelectionTest(unittest.TestCase):
+
+    def test_roi_mask_uses_box_centres(self):
+        boxes, _, _ = _detections([[90, 90, 110, 110],    # centre (100, 100)
+                                   [100, 100, 141, 100],  # centre (120, 100), on the edge
+                                   [100, 100, 143, 100]], # centre (121, 100)
+                                  [0.5, 0.5, 0.5])
+        mask = detect.roi_mask(boxes, 100, 100, 20, 20)
+        self.assertEqual(mask.tolist(), [True, True, False])
+
+    def test_prefers_roi_hit_over_more_confident_outside(self):
+        det = _detections([[0, 0, 10, 10], [95, 95, 105, 105]], [0.9, 0.6])
+        mask = detect.roi_mask(det[0], 100, 100, 20, 20)
+        hit = detect.select_best_hit_with_roi_priority(det, mask)
+        self.assertEqual(hit["index"], 1)
+        self.assertTrue(hit["in_roi"])
+        self.assertEqual((hit["u"], hit["v"]), (100, 100))
+
+    def test_falls_back_to_most_confident(self):
+        det = _detections([[0, 0, 10, 10], [300, 300, 310, 310]], [0.4, 0.7])
+        mask = detect.roi_mask(det[0], 100, 100, 20, 20)
+        hit = detect.select_best_hit_with_roi_priority(det, mask)
+        self.assertEqual(hit["index"], 1)
+        self.assertFalse(hit["in_roi"])
+
+    def test_no_detections(self):
+        det = detect.EMPTY_DETECTIONS
+        mask = detect.roi_mask(det[0], 100, 100, 20, 20)
+        self.assertIsNone(detect.select_best_hit_with_roi_priority(det, mask))
+
+
+if __name__ == '__main__':
+    unittest.main()